@@ -89,6 +89,7 @@ from fastapi.middleware.cors import CORSMiddleware
 
 # === Configuration ===
 MCP_URL = os.environ.get("MCP_URL", "http://127.0.0.1:3009/sse")
+ASK_RECORD_FILE = os.environ.get("ASK_RECORD_FILE")  # record /ask traffic for `python -m loadtest.run`
 
 # === FastAPI App ===
 app = FastAPI()
@@ -117,6 +118,9 @@ import json  # Add this at the top
 @app.post("/ask")
 async def ask_query(data: Query):
     print(f"📨 Incoming query: {data.query} (user_id: {data.user_id}, thread_id: {data.thread_id})")
+    if ASK_RECORD_FILE:
+        from loadtest.traffic import append_record
+        append_record(ASK_RECORD_FILE, data.query, data.user_id, data.thread_id)
 
     try:
         mcp_client = BasicMCPClient(MCP_URL)
@@ -127,12 +131,6 @@ async def ask_query(data: Query):
                 "user_instruction": data.query,
                 "user_id": data.user_id,
                 "thread_id": data.thread_id
-            },
-            {
-                "configurable": {
-                    "user_id": data.user_id,
-                    "thread_id": data.thread_id
-                }
             }
         )
 
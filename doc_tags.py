@@ -0,0 +1,70 @@
+import os
+import re
+
+# (filename pattern, provider, product) — first match wins.
+# PHI (Personal Health Insurance) sample plans and the EHC claim form are Sun Life
+# documents, so they share the Sun Life partition and differ only by product.
+PROVIDER_RULES = [
+    (r"cibc", "CIBC", "travel"),
+    (r"manulife", "Manulife", "health-dental"),
+    (r"phi-|personal health insurance", "Sun Life", "PHI"),
+    (r"ehc", "Sun Life", "EHC"),
+    (r"sun ?life", "Sun Life", "health"),
+    (r"ohip", "OHIP", "provincial-health"),
+    (r"uhip|ramu", "UHIP", "student-health"),
+]
+
+DOC_TYPES = {
+    ".pdf": "policy",
+    ".html": "webpage",
+    ".htm": "webpage",
+    ".txt": "letter",
+}
+
+FILTER_KEYS = ("provider", "product", "doc_type", "page")
+
+
+def classify_source(path: str) -> dict:
+    """Provider / product / document type for a source file, from its name."""
+    name = os.path.basename(path).lower()
+    tags = {"provider": "unknown", "product": "unknown"}
+    for pattern, provider, product in PROVIDER_RULES:
+        if re.search(pattern, name):
+            tags = {"provider": provider, "product": product}
+            break
+    if "sample" in name:
+        tags["doc_type"] = "sample-plan"
+    elif "fillable" in name:
+        tags["doc_type"] = "form"
+    else:
+        tags["doc_type"] = DOC_TYPES.get(os.path.splitext(name)[1], "other")
+    return tags
+
+
+def tag_documents(documents):
+    """Add provider, product, doc_type and page metadata to loaded documents in place."""
+    for doc in documents:
+        doc.metadata.update(classify_source(doc.metadata.get("source", "")))
+        doc.metadata["page"] = int(doc.metadata.get("page", 0))
+    return documents
+
+
+def partition_name(provider: str) -> str:
+    """Chroma collection name for a provider partition."""
+    slug = re.sub(r"[^a-z0-9]+", "-", provider.lower()).strip("-")
+    return f"provider-{slug or 'unknown'}"
+
+
+def build_where(filters: dict):
+    """Translate `{"provider": "CIBC", "page": [1, 2]}` into a Chroma `where` clause."""
+    clauses = []
+    for key, value in (filters or {}).items():
+        if key not in FILTER_KEYS:
+            raise ValueError(f"Unsupported filter '{key}'; expected one of {FILTER_KEYS}")
+        if isinstance(value, (list, tuple, set)):
+            clauses.append({key: {"$in": list(value)}})
+        else:
+            clauses.append({key: value})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
@@ -0,0 +1,168 @@
+"""
+On-disk cache of extracted PDF pages, keyed by file hash.
+
+    .doc_cache/<sha256>-<parser>/
+      pages.bin     ← all page texts, UTF-8, back to back (read via mmap)
+      index.json    ← per-page offset / length + layout metadata
+
+Re-chunking experiments reuse the cached text instead of re-parsing the PDF.
+Cache misses are parsed page-parallel across processes. Saved web pages
+(.html) are reduced to their visible text with the stdlib HTML parser.
+"""
+import hashlib
+import html.parser
+import json
+import mmap
+import os
+import shutil
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from langchain_core.documents import Document
+from pypdf import PdfReader
+
+DOC_CACHE_DIR = os.environ.get("DOC_CACHE_DIR", ".doc_cache")
+PARSE_WORKERS = int(os.environ.get("PARSE_WORKERS", str(os.cpu_count() or 1)))
+PAGES_PER_TASK = 8
+PARSER_VERSION = "pypdf1"  # bump to invalidate cached extractions
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _extract_range(path: str, start: int, end: int) -> list:
+    """Worker: extract pages [start, end) → [(page, text, layout)]."""
+    reader = PdfReader(path)
+    results = []
+    for number in range(start, end):
+        page = reader.pages[number]
+        box = page.mediabox
+        layout = {
+            "width": float(box.width),
+            "height": float(box.height),
+            "rotation": int(page.rotation or 0),
+        }
+        results.append((number, page.extract_text() or "", layout))
+    return results
+
+
+def _parse_pdf(path: str) -> list:
+    page_count = len(PdfReader(path).pages)
+    ranges = [(s, min(s + PAGES_PER_TASK, page_count)) for s in range(0, page_count, PAGES_PER_TASK)]
+    if PARSE_WORKERS <= 1 or len(ranges) <= 1:
+        pages = [p for s, e in ranges for p in _extract_range(path, s, e)]
+    else:
+        with ProcessPoolExecutor(max_workers=min(PARSE_WORKERS, len(ranges))) as pool:
+            futures = [pool.submit(_extract_range, path, s, e) for s, e in ranges]
+            pages = [p for fut in futures for p in fut.result()]
+    return sorted(pages, key=lambda p: p[0])
+
+
+def _write_entry(entry_dir: str, source: str, pages: list) -> None:
+    tmp_dir = f"{entry_dir}.{uuid.uuid4().hex}.tmp"
+    os.makedirs(tmp_dir)
+    index, offset = [], 0
+    with open(os.path.join(tmp_dir, "pages.bin"), "wb") as f:
+        for number, text, layout in pages:
+            data = text.encode("utf-8")
+            f.write(data)
+            index.append({"page": number, "offset": offset, "length": len(data), **layout})
+            offset += len(data)
+    with open(os.path.join(tmp_dir, "index.json"), "w") as f:
+        json.dump({"source": source, "pages": index}, f)
+    try:
+        os.rename(tmp_dir, entry_dir)
+    except OSError:
+        # Another process cached the same file first
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _read_entry(entry_dir: str, source: str) -> list:
+    with open(os.path.join(entry_dir, "index.json")) as f:
+        index = json.load(f)["pages"]
+    documents = []
+    with open(os.path.join(entry_dir, "pages.bin"), "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        try:
+            for item in index:
+                text = buf[item["offset"]:item["offset"] + item["length"]].decode("utf-8")
+                metadata = {k: v for k, v in item.items() if k not in ("offset", "length")}
+                metadata["source"] = source
+                documents.append(Document(page_content=text, metadata=metadata))
+        finally:
+            if size:
+                buf.close()
+    return documents
+
+
+def load_pdf(path: str) -> list:
+    """Drop-in for `PyPDFLoader(path).load()` backed by the page cache."""
+    entry_dir = os.path.join(DOC_CACHE_DIR, f"{file_hash(path)}-{PARSER_VERSION}")
+    if not os.path.isdir(entry_dir):
+        os.makedirs(DOC_CACHE_DIR, exist_ok=True)
+        print(f"📄 Parsing {path} (not cached)")
+        _write_entry(entry_dir, path, _parse_pdf(path))
+    return _read_entry(entry_dir, path)
+
+
+# === HTML ===
+_SKIP_TAGS = {"script", "style", "noscript", "svg", "template", "head", "nav", "footer", "iframe"}
+_BLOCK_TAGS = {"p", "div", "section", "article", "li", "ul", "ol", "table", "tr", "td", "th",
+               "h1", "h2", "h3", "h4", "h5", "h6", "br", "header", "main", "dd", "dt", "blockquote"}
+
+
+class _TextExtractor(html.parser.HTMLParser):
+    """Visible text of a page, one line per block element."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.title = []
+        self._skip = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "title":
+            self._in_title = True
+        elif tag in _SKIP_TAGS:
+            self._skip += 1
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+        elif tag in _SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title.append(data)
+        elif not self._skip:
+            self.parts.append(data)
+
+    def text(self) -> str:
+        lines = (" ".join(line.split()) for line in "".join(self.parts).splitlines())
+        return "\n".join(line for line in lines if line)
+
+
+def load_html(path: str) -> list:
+    """Visible text of a saved web page as a single Document (page 0)."""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        parser = _TextExtractor()
+        parser.feed(f.read())
+        parser.close()
+    metadata = {"source": path, "page": 0, "title": " ".join("".join(parser.title).split())}
+    return [Document(page_content=parser.text(), metadata=metadata)]
@@ -0,0 +1,307 @@
+"""
+Write-behind draft persistence.
+
+Writes are appended to a journal and acknowledged according to the requested
+durability level; a background thread group-commits the journal (one fsync per
+batch) and then materializes files under a sandboxed per-user root.
+
+Durability levels:
+    "memory"  – ack once queued (lost on crash before the next group commit)
+    "journal" – ack once the journal batch is fsynced (default)
+    "fsync"   – ack once the target file itself is written and fsynced
+"""
+import atexit
+import json
+import os
+import re
+import threading
+import time
+import uuid
+
+DRAFT_DURABILITY = os.environ.get("DRAFT_DURABILITY", "journal")
+DURABILITY_LEVELS = ("memory", "journal", "fsync")
+JOURNAL_NAME = ".journal"
+JOURNAL_CHECKPOINT_BYTES = 4 * 1024 * 1024
+APPLY_RETRY_SECONDS = 1.0
+
+
+class _Write:
+    __slots__ = ("relpath", "data", "durability", "journaled", "applied", "error")
+
+    def __init__(self, relpath: str, data: str, durability: str):
+        self.relpath = relpath
+        self.data = data
+        self.durability = durability
+        self.journaled = threading.Event()
+        self.applied = threading.Event()
+        self.error = None
+
+
+def safe_component(value: str) -> str:
+    """Reduce a user-supplied name to a single safe path component."""
+    value = re.sub(r"[^\w.\- ]", "_", str(value)).strip(" .")
+    if not value:
+        raise ValueError("Empty name after sanitizing")
+    return value
+
+
+class DraftStore:
+
+    def __init__(self, root: str, flush_interval: float = 0.002, max_batch: int = 256):
+        self.root = os.path.realpath(root)
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        os.makedirs(self.root, exist_ok=True)
+        self.journal_path = os.path.join(self.root, JOURNAL_NAME)
+        self._pending = []
+        self._overlay = {}  # relpath → latest not-yet-materialized data
+        self._last_write = None
+        self._unsynced = set()  # relpaths materialized without fsync since the last checkpoint
+        self._failed = {}  # relpath → (data, sync) journaled but not yet materialized
+        self._cond = threading.Condition()
+        self._closed = False
+        self._recover()
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+        self._worker = threading.Thread(target=self._run, name="draft-store-flusher", daemon=True)
+        self._worker.start()
+        atexit.register(self.close)
+
+    # === Paths ===
+    def resolve(self, user_id: str, name: str) -> str:
+        """Path relative to the store root, confined to the user's directory."""
+        relpath = os.path.join(safe_component(user_id), safe_component(os.path.basename(name)))
+        full = os.path.realpath(os.path.join(self.root, relpath))
+        if os.path.commonpath([full, self.root]) != self.root:
+            raise ValueError(f"Path escapes draft root: {name}")
+        return relpath
+
+    def path(self, user_id: str, name: str) -> str:
+        return os.path.join(self.root, self.resolve(user_id, name))
+
+    # === Public API ===
+    def write_text(self, user_id: str, name: str, text: str, durability: str = None) -> str:
+        """Queue a write; returns the path relative to the store root (`<user_id>/<name>`)."""
+        durability = durability or DRAFT_DURABILITY
+        if durability not in DURABILITY_LEVELS:
+            raise ValueError(f"Unknown durability '{durability}', expected one of {DURABILITY_LEVELS}")
+        relpath = self.resolve(user_id, name)
+        write = _Write(relpath, text, durability)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("DraftStore is closed")
+            self._overlay[relpath] = text
+            self._pending.append(write)
+            self._last_write = write
+            self._cond.notify()
+        if durability == "journal":
+            write.journaled.wait()
+        elif durability == "fsync":
+            write.applied.wait()
+        if write.error is not None:
+            raise write.error
+        return relpath
+
+    def write_json(self, user_id: str, name: str, obj, durability: str = None) -> str:
+        return self.write_text(user_id, name, json.dumps(obj), durability)
+
+    def read_text(self, user_id: str, name: str):
+        relpath = self.resolve(user_id, name)
+        with self._cond:
+            if relpath in self._overlay:
+                return self._overlay[relpath]
+        try:
+            with open(os.path.join(self.root, relpath), encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def read_json(self, user_id: str, name: str):
+        text = self.read_text(user_id, name)
+        return json.loads(text) if text is not None else None
+
+    def list(self, user_id: str) -> list:
+        user_dir = safe_component(user_id)
+        names = set()
+        if os.path.isdir(os.path.join(self.root, user_dir)):
+            names.update(n for n in os.listdir(os.path.join(self.root, user_dir)) if not n.endswith(".tmp"))
+        with self._cond:
+            names.update(os.path.basename(p) for p in self._overlay if os.path.dirname(p) == user_dir)
+        return sorted(names)
+
+    def flush(self) -> None:
+        """Block until everything queued so far is materialized (or queued for retry)."""
+        with self._cond:
+            last = self._last_write
+        if last is not None:
+            last.applied.wait()
+
+    def close(self) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._worker.join()
+        self._journal.close()
+
+    # === Background group commit ===
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    if self._failed:
+                        self._cond.wait(APPLY_RETRY_SECONDS)
+                        break
+                    self._cond.wait()
+                closing = self._closed and not self._pending
+            if self._failed:
+                self._retry_failed()
+            if closing:
+                if self._failed:
+                    print(f"⚠️ {len(self._failed)} draft writes left in the journal for replay")
+                return
+            time.sleep(self.flush_interval)  # let concurrent writers join the batch
+            with self._cond:
+                batch = self._pending[:self.max_batch]
+                del self._pending[:len(batch)]
+            if not batch:
+                continue
+            try:
+                self._commit(batch)
+            except Exception as e:
+                # Nothing in this batch is durable, so nothing may be acknowledged or read back
+                print(f"🔥 Draft journal commit failed: {e}")
+                with self._cond:
+                    for write in batch:
+                        if self._overlay.get(write.relpath) is write.data:
+                            del self._overlay[write.relpath]
+                for write in batch:
+                    write.error = e
+                    write.journaled.set()
+                    write.applied.set()
+                continue
+            self._apply(batch)
+            self._maybe_checkpoint()
+
+    def _commit(self, batch) -> None:
+        for write in batch:
+            self._journal.write(json.dumps({"path": write.relpath, "data": write.data}) + "\n")
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        for write in batch:
+            write.journaled.set()
+
+    def _apply(self, batch) -> None:
+        # Only the last write per path in a batch needs to hit the file system
+        latest = {}
+        for write in batch:
+            latest[write.relpath] = write
+        for relpath, write in latest.items():
+            needs_fsync = any(w.durability == "fsync" for w in batch if w.relpath == relpath)
+            try:
+                self._materialize(relpath, write.data, needs_fsync)
+            except Exception as e:
+                # Already journaled: keep it (and its overlay entry) and retry until it lands
+                print(f"🔥 Draft write {relpath} failed, will retry: {e}")
+                self._failed[relpath] = (write.data, needs_fsync)
+                for w in batch:
+                    if w.relpath == relpath and w.durability == "fsync":
+                        w.error = e
+                continue
+            self._materialized(relpath, write.data)
+        for write in batch:
+            write.applied.set()
+
+    def _retry_failed(self) -> None:
+        for relpath, (data, sync) in list(self._failed.items()):
+            try:
+                self._materialize(relpath, data, sync)
+            except Exception:
+                continue
+            self._materialized(relpath, data)
+
+    def _materialized(self, relpath: str, data: str) -> None:
+        self._failed.pop(relpath, None)
+        with self._cond:
+            if self._overlay.get(relpath) is data:
+                del self._overlay[relpath]
+
+    def _materialize(self, relpath: str, data: str, sync: bool) -> None:
+        target = os.path.join(self.root, relpath)
+        directory = os.path.dirname(target)
+        if not os.path.isdir(directory):
+            os.makedirs(directory, exist_ok=True)
+            if sync:
+                _fsync_dir(self.root)  # make the new user directory's entry durable
+        tmp = f"{target}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(data)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, target)
+        if sync:
+            _fsync_dir(directory)  # the rename itself must survive a crash
+            self._unsynced.discard(relpath)
+        else:
+            self._unsynced.add(relpath)
+
+    def _maybe_checkpoint(self) -> None:
+        # The journal can only be reset once every record in it is materialized
+        with self._cond:
+            if self._failed or self._pending or self._journal.tell() < JOURNAL_CHECKPOINT_BYTES:
+                return
+        # Files written since the last checkpoint must be durable before the journal forgets them
+        directories = {self.root}
+        for relpath in self._unsynced:
+            target = os.path.join(self.root, relpath)
+            fd = os.open(target, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            directories.add(os.path.dirname(target))
+        for directory in directories:
+            _fsync_dir(directory)
+        self._unsynced.clear()
+        self._journal.truncate(0)
+        self._journal.seek(0)
+        os.fsync(self._journal.fileno())
+
+    def _recover(self) -> None:
+        """Replay a journal left behind by a crash, then reset it."""
+        if not os.path.exists(self.journal_path):
+            return
+        replayed = 0
+        with open(self.journal_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # torn tail from an interrupted write
+                self._materialize(record["path"], record["data"], sync=True)
+                replayed += 1
+        os.truncate(self.journal_path, 0)
+        if replayed:
+            print(f"♻️ Replayed {replayed} journaled draft writes in {self.root}")
+
+
+def _fsync_dir(path: str) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_draft_store(root: str) -> DraftStore:
+    """One store (and flusher thread) per root directory."""
+    key = os.path.realpath(root)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = DraftStore(root)
+        return _stores[key]
@@ -1,17 +1,28 @@
 # ------------------ drafter1.py ------------------
+import os
 from typing import Annotated, Sequence, TypedDict
 from langchain_core.messages import BaseMessage, HumanMessage, ToolMessage, SystemMessage
 from langchain_core.tools import tool
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph.message import add_messages
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolNode
 from langchain_ollama import ChatOllama
 from fastapi.concurrency import run_in_threadpool
 from mcp.server.fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from llm_cache import cached_call
+from draft_store import get_draft_store
+from session_manager import sessions
 
 # === MCP server initialization ===
 mcp = FastMCP("DrafterService", port=3009)
 
+# Saved drafts land in DRAFTS_DIR/<user_id>/, written behind a durable journal
+DRAFTS_DIR = os.environ.get("DRAFTS_DIR", "drafts")
+store = get_draft_store(DRAFTS_DIR)
+
 # === Global content holder ===
 document_content = ""
 
@@ -31,15 +42,15 @@ def update(content: str) -> str:
     )
 
 @tool
-def save(filename: str) -> str:
+def save(filename: str, config: RunnableConfig) -> str:
     """Save the current document to a text file."""
     global document_content
     if not filename.endswith(".txt"):
         filename += ".txt"
+    user_id = config.get("configurable", {}).get("user_id", "anonymous")
     try:
-        with open(filename, "w") as f:
-            f.write(document_content)
-        return f"💾 Document saved successfully as '{filename}'."
+        path = store.write_text(user_id, filename, document_content)
+        return f"💾 Document saved successfully as '{path}'."
     except Exception as e:
         return f"❌ Failed to save document: {str(e)}"
 
@@ -48,10 +59,14 @@ def save(filename: str) -> str:
 tools = [update, save]
 
 # Chat model
+MODEL_NAME = "llama3.2"
+TEMPERATURE = float(os.environ.get("DRAFTER_TEMPERATURE", "0.7"))  # 0 enables response caching
+OLLAMA_BASE_URL = os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434")
+
 model = ChatOllama(
-    model="llama3.2",
-    temperature=0.7,
-    base_url="http://localhost:11434"
+    model=MODEL_NAME,
+    temperature=TEMPERATURE,
+    base_url=OLLAMA_BASE_URL
 ).bind_tools(tools)
 
 # Agent logic
@@ -69,14 +84,23 @@ Current document:
 {document_content}
 """)
 
-    user_message = state["messages"][-1]
     messages = [system_prompt] + list(state["messages"])
-    response = model.invoke(messages)
-    return {"messages": state["messages"] + [user_message, response]}
+    response = cached_call(
+        MODEL_NAME,
+        messages,
+        lambda: model.invoke(messages),
+        tools=tools,
+        params={"temperature": TEMPERATURE}
+    )
+    # add_messages appends — return only the new message
+    return {"messages": [response]}
 
 # Conditional flow control
 def should_continue(state: AgentState) -> str:
+    # Only this turn's tool results count — earlier turns are in the history too
     for msg in reversed(state["messages"]):
+        if isinstance(msg, HumanMessage):
+            break
         if isinstance(msg, ToolMessage):
             if "updated" in msg.content.lower() or "saved" in msg.content.lower():
                 return "end"
@@ -93,15 +117,23 @@ app = graph.compile()
 
 # Run one session
 def run_drafter_session(user_input: str, config: dict) -> dict:
-    state = {"messages": [HumanMessage(content=user_input)]}
+    # Per-thread history is held by the session manager (bounded, LRU-evicted to disk)
+    configurable = config.get("configurable", {})
+    # Thread ids are only unique per user, so the session key includes both
+    session_id = f"{configurable.get('user_id', 'anonymous')}:{configurable.get('thread_id', 'default')}"
+    history = sessions.get(session_id)
+    state = {"messages": history + [HumanMessage(content=user_input)]}
     result = ""
     is_done = False
+    final_messages = state["messages"]
     for step in app.stream(state, config=config, stream_mode="values"):
-        for msg in step.get("messages", []):
+        final_messages = step.get("messages", final_messages)
+        for msg in final_messages[len(history):]:
             if isinstance(msg, ToolMessage):
                 result = msg.content
                 if "saved" in result.lower() or "updated" in result.lower():
                     is_done = True
+    sessions.append(session_id, final_messages[len(history):])
     return {
         "output": result or "No output generated.",
         "status": "done" if is_done else "waiting"
@@ -109,7 +141,7 @@ def run_drafter_session(user_input: str, config: dict) -> dict:
 
 # MCP-compatible tool
 @mcp.tool()
-async def drafter_tool(user_instruction: str, config: dict = None) -> dict:
+async def drafter_tool(user_instruction: str, user_id: str = "anonymous", thread_id: str = "default") -> dict:
     """
     MCP-compatible tool to run one round of the Drafter assistant.
     """
@@ -120,7 +152,7 @@ async def drafter_tool(user_instruction: str, config: dict = None) -> dict:
                 "status": "error"
             }
 
-        config = config or {"configurable": {"thread_id": "default"}}
+        config = {"configurable": {"user_id": user_id, "thread_id": thread_id}}
         return await run_in_threadpool(run_drafter_session, user_instruction, config)
 
     except Exception as e:
@@ -130,6 +162,12 @@ async def drafter_tool(user_instruction: str, config: dict = None) -> dict:
         }
 
 
+# Session memory metrics — a plain HTTP route, kept out of the LLM-visible tool list
+@mcp.custom_route("/metrics/sessions", methods=["GET"])
+async def session_metrics(request: Request) -> JSONResponse:
+    return JSONResponse(sessions.metrics())
+
+
 # Main entrypoint
 if __name__ == "__main__":
     import argparse
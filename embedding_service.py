@@ -0,0 +1,178 @@
+import asyncio
+import bisect
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+# === Configuration ===
+EMBED_BATCH_WINDOW_MS = float(os.environ.get("EMBED_BATCH_WINDOW_MS", "5"))
+EMBED_MAX_BATCH_SIZE = int(os.environ.get("EMBED_MAX_BATCH_SIZE", "32"))
+EMBED_METRICS_LOG_SECONDS = float(os.environ.get("EMBED_METRICS_LOG_SECONDS", "60"))  # 0 disables
+
+
+class Histogram:
+    """Fixed-bucket histogram (Prometheus-style cumulative buckets)."""
+
+    def __init__(self, buckets):
+        self.buckets = sorted(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.total += value
+            self.count += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            cumulative, running = {}, 0
+            for bound, n in zip(self.buckets + [float("inf")], self.counts):
+                running += n
+                cumulative[str(bound)] = running
+            return {"buckets": cumulative, "sum": self.total, "count": self.count}
+
+    def mean(self) -> float:
+        with self._lock:
+            return self.total / self.count if self.count else 0.0
+
+
+class _Request:
+    __slots__ = ("text", "future", "enqueued_at")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class BatchingEmbeddingService(Embeddings):
+    """
+    Collects concurrent `embed_query` calls for up to `window_ms` (or until
+    `max_batch_size` is reached), embeds them in one batched forward pass and
+    hands each caller its own vector.
+
+    Usable anywhere a LangChain `Embeddings` is expected (e.g. Chroma).
+    """
+
+    def __init__(self, embeddings: Embeddings, window_ms: float = EMBED_BATCH_WINDOW_MS,
+                 max_batch_size: int = EMBED_MAX_BATCH_SIZE):
+        self.embeddings = embeddings
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self.batch_size_hist = Histogram([1, 2, 4, 8, 16, 32, 64, 128])
+        self.queue_wait_hist = Histogram([0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0])
+        self._queue = queue.Queue()
+        self._last_log = time.monotonic()
+        self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._worker.start()
+
+    # === Public API ===
+    def embed_query(self, text: str) -> List[float]:
+        return self.submit(text).result()
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await asyncio.wrap_future(self.submit(text))
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        # Bulk ingestion is already batched — bypass the queue
+        return self.embeddings.embed_documents(texts)
+
+    def submit(self, text: str) -> Future:
+        request = _Request(text)
+        self._queue.put(request)
+        return request.future
+
+    def metrics(self) -> dict:
+        return {
+            "batch_size": self.batch_size_hist.snapshot(),
+            "queue_wait_seconds": self.queue_wait_hist.snapshot(),
+            "queue_depth": self._queue.qsize(),
+        }
+
+    # === Worker ===
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            try:
+                self._process(batch)
+                self._maybe_log_metrics()
+            except Exception as e:
+                # Never let one bad batch take down the only worker
+                print(f"🔥 Embedding batch failed: {e}")
+                for request in batch:
+                    _resolve(request.future, error=e)
+
+    def _maybe_log_metrics(self) -> None:
+        if not EMBED_METRICS_LOG_SECONDS or time.monotonic() - self._last_log < EMBED_METRICS_LOG_SECONDS:
+            return
+        self._last_log = time.monotonic()
+        print(
+            f"📊 Embedding batches: {self.batch_size_hist.count}, "
+            f"mean size {self.batch_size_hist.mean():.1f}, "
+            f"mean queue wait {self.queue_wait_hist.mean() * 1000:.1f} ms, "
+            f"queue depth {self._queue.qsize()}"
+        )
+
+    def _process(self, batch) -> None:
+        # Callers that gave up (e.g. a cancelled aembed_query) are dropped before the forward pass
+        batch = [r for r in batch if r.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        started = time.perf_counter()
+        for request in batch:
+            self.queue_wait_hist.observe(started - request.enqueued_at)
+        self.batch_size_hist.observe(len(batch))
+        try:
+            vectors = self.embeddings.embed_documents([r.text for r in batch])
+        except Exception as e:
+            for request in batch:
+                _resolve(request.future, error=e)
+            return
+        for request, vector in zip(batch, vectors):
+            _resolve(request.future, value=vector)
+
+
+def _resolve(future: Future, value=None, error: Exception = None) -> None:
+    try:
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(value)
+    except InvalidStateError:
+        pass  # already resolved or cancelled
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_embedding_service() -> BatchingEmbeddingService:
+    """Process-wide service wrapping the BGE model (loaded once)."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                from embeddings import load_bge_model
+                _service = BatchingEmbeddingService(load_bge_model())
+    return _service
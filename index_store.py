@@ -0,0 +1,197 @@
+"""
+Versioned Chroma index snapshots.
+
+    db/
+      CURRENT                  ← name of the live snapshot
+      snapshots/<version>/     ← one self-contained Chroma persist directory each
+        partitions.json        ← provider → collection name for per-provider partitions
+
+Ingestion builds into a fresh snapshot, validates it, then atomically swaps
+CURRENT. Retrievers re-read CURRENT and pick up the new snapshot without a
+restart. Without a CURRENT file the legacy flat `db/` directory is used.
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+
+from langchain_community.vectorstores import Chroma
+from doc_tags import partition_name
+
+DB_ROOT = os.environ.get("DB_ROOT", "db")
+SNAPSHOT_DIR = os.path.join(DB_ROOT, "snapshots")
+POINTER_FILE = os.path.join(DB_ROOT, "CURRENT")
+KEEP_SNAPSHOTS = int(os.environ.get("KEEP_SNAPSHOTS", "2"))
+SMOKE_QUERY = os.environ.get("SMOKE_QUERY", "What is covered by the insurance plan?")
+ADD_BATCH_SIZE = 500
+PARTITIONS_FILE = "partitions.json"
+
+
+# === Pointer ===
+def current_snapshot():
+    """Name of the live snapshot, or None when running on the legacy layout."""
+    try:
+        with open(POINTER_FILE) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def current_snapshot_path() -> str:
+    name = current_snapshot()
+    return os.path.join(SNAPSHOT_DIR, name) if name else DB_ROOT
+
+
+def load_partitions(path: str) -> dict:
+    """provider → collection name for a snapshot directory ({} if not partitioned)."""
+    try:
+        with open(os.path.join(path, PARTITIONS_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def activate_snapshot(name: str) -> None:
+    """Atomically point CURRENT at `name`."""
+    if not os.path.isdir(os.path.join(SNAPSHOT_DIR, name)):
+        raise FileNotFoundError(f"Snapshot '{name}' does not exist")
+    tmp = f"{POINTER_FILE}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "w") as f:
+        f.write(name)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, POINTER_FILE)
+    dir_fd = os.open(DB_ROOT, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+# === Build ===
+def compact_documents(texts):
+    """Drop duplicate chunks so re-ingesting the same sources doesn't bloat HNSW."""
+    seen, unique = set(), []
+    for doc in texts:
+        key = hashlib.sha1(
+            f"{doc.metadata.get('source')}|{doc.metadata.get('page')}|{doc.page_content}".encode("utf-8")
+        ).hexdigest()
+        if key not in seen:
+            seen.add(key)
+            unique.append(doc)
+    return unique
+
+
+def _embed(texts, embedding) -> list:
+    vectors = []
+    for start in range(0, len(texts), ADD_BATCH_SIZE):
+        vectors.extend(embedding.embed_documents([d.page_content for d in texts[start:start + ADD_BATCH_SIZE]]))
+    return vectors
+
+
+def _write_collection(path: str, rows, embedding, collection_name: str = None) -> None:
+    """Add precomputed (id, vector, doc) rows to a collection — no re-embedding."""
+    kwargs = {"collection_name": collection_name} if collection_name else {}
+    db = Chroma(persist_directory=path, embedding_function=embedding, **kwargs)
+    for start in range(0, len(rows), ADD_BATCH_SIZE):
+        batch = rows[start:start + ADD_BATCH_SIZE]
+        db._collection.add(
+            ids=[row_id for row_id, _, _ in batch],
+            embeddings=[vector for _, vector, _ in batch],
+            metadatas=[doc.metadata for _, _, doc in batch],
+            documents=[doc.page_content for _, _, doc in batch],
+        )
+    db.persist()
+
+
+def _provider_counts(texts) -> dict:
+    counts = {}
+    for doc in texts:
+        provider = doc.metadata.get("provider")
+        if provider:
+            counts[provider] = counts.get(provider, 0) + 1
+    return counts
+
+
+def build_snapshot(texts, embedding) -> str:
+    """
+    Write `texts` into a brand-new snapshot directory and return its name.
+    Chunks are embedded once; the same vectors also fill one partition
+    collection per provider.
+    """
+    name = time.strftime("%Y%m%d-%H%M%S") + "-" + uuid.uuid4().hex[:6]
+    path = os.path.join(SNAPSHOT_DIR, name)
+    os.makedirs(path)
+    try:
+        rows = [(uuid.uuid4().hex, vector, doc) for doc, vector in zip(texts, _embed(texts, embedding))]
+        _write_collection(path, rows, embedding)
+
+        by_provider = {}
+        for row in rows:
+            provider = row[2].metadata.get("provider")
+            if provider:
+                by_provider.setdefault(provider, []).append(row)
+        partitions = {}
+        for provider, provider_rows in by_provider.items():
+            partitions[provider] = partition_name(provider)
+            _write_collection(path, provider_rows, embedding, partitions[provider])
+        with open(os.path.join(path, PARTITIONS_FILE), "w") as f:
+            json.dump(partitions, f, indent=2)
+    except Exception:
+        shutil.rmtree(path, ignore_errors=True)
+        raise
+    return name
+
+
+def _smoke_test(db, label: str, expected_count: int) -> None:
+    count = db._collection.count()
+    if count != expected_count:
+        raise ValueError(f"{label} has {count} chunks, expected {expected_count}")
+    if expected_count and not db.similarity_search(SMOKE_QUERY, k=1):
+        raise ValueError(f"{label} returned no results for smoke query")
+
+
+def validate_snapshot(name: str, embedding, texts) -> None:
+    """Smoke-test the full collection and every provider partition; raises on failure."""
+    path = os.path.join(SNAPSHOT_DIR, name)
+    _smoke_test(Chroma(persist_directory=path, embedding_function=embedding),
+                f"Snapshot '{name}'", len(texts))
+    expected = _provider_counts(texts)
+    partitions = load_partitions(path)
+    missing = set(expected) - set(partitions)
+    if missing:
+        raise ValueError(f"Snapshot '{name}' is missing partitions for {sorted(missing)}")
+    for provider, collection_name in partitions.items():
+        db = Chroma(persist_directory=path, embedding_function=embedding, collection_name=collection_name)
+        _smoke_test(db, f"Partition '{collection_name}' of '{name}'", expected.get(provider, 0))
+
+
+def gc_snapshots(keep: int = KEEP_SNAPSHOTS) -> list:
+    """Delete all but the `keep` newest snapshots (never the live one)."""
+    if not os.path.isdir(SNAPSHOT_DIR):
+        return []
+    live = current_snapshot()
+    names = sorted(os.listdir(SNAPSHOT_DIR), reverse=True)
+    removed = []
+    for name in names[keep:]:
+        if name != live:
+            shutil.rmtree(os.path.join(SNAPSHOT_DIR, name), ignore_errors=True)
+            removed.append(name)
+    return removed
+
+
+def publish_snapshot(texts, embedding) -> str:
+    """Build → compact → validate → swap → GC. Returns the new live snapshot name."""
+    texts = compact_documents(texts)
+    name = build_snapshot(texts, embedding)
+    try:
+        validate_snapshot(name, embedding, texts)
+    except Exception:
+        shutil.rmtree(os.path.join(SNAPSHOT_DIR, name), ignore_errors=True)
+        raise
+    activate_snapshot(name)
+    removed = gc_snapshots()
+    print(f"🔁 Snapshot '{name}' is live ({len(texts)} chunks, removed {len(removed)} old)")
+    return name
@@ -1,26 +1,34 @@
 import os
-from langchain_community.vectorstores import Chroma
-from langchain_community.document_loaders import PyPDFLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from embeddings import load_bge_model
+from index_store import publish_snapshot
+from doc_tags import tag_documents
+from document_cache import load_html, load_pdf
+
+SOURCE_DIRS = os.environ.get("INGEST_DIRS", "data,text").split(",")
 
 def ingest_documents():
     documents = []
-    for file in os.listdir("data"):
-        if file.endswith(".pdf"):
-            loader = PyPDFLoader(os.path.join("data", file))
-            documents.extend(loader.load())
+    for directory in SOURCE_DIRS:
+        if not os.path.isdir(directory):
+            continue
+        for file in sorted(os.listdir(directory)):
+            if file.endswith(".pdf"):
+                # Cached by file hash — only new or changed PDFs are re-parsed
+                documents.extend(load_pdf(os.path.join(directory, file)))
+            elif file.endswith((".html", ".htm")):
+                # Provider web pages (Manulife, Sun Life, OHIP, UHIP)
+                documents.extend(load_html(os.path.join(directory, file)))
+
+    # Provider / product / doc_type / page tags drive filtered retrieval
+    tag_documents(documents)
 
     splitter = RecursiveCharacterTextSplitter(chunk_size=200, chunk_overlap=100)
     texts = splitter.split_documents(documents)
 
     bge_model = load_bge_model()
-    db = Chroma.from_documents(
-        documents=texts,
-        embedding=bge_model,
-        persist_directory="db"
-    )
-    db.persist()
+    # Build into a new snapshot; the live index is only swapped once it validates
+    publish_snapshot(texts, bge_model)
     print("✅ Ingestion complete.")
 
 if __name__ == "__main__":
@@ -0,0 +1,127 @@
+import math
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+# tool name → keyword patterns that clearly identify it
+DEFAULT_RULES = {
+    "drafter_tool": [
+        r"\b(draft|redraft|compose|rewrite|reword|proofread)\b",
+        r"\b(write|edit|revise)\b.*\b(email|e-mail|letter|note|message|reply|apology)\b",
+        r"\b(email|letter)\b.*\b(to|for)\b",
+        r"\b(save|store)\b.*\b(draft|document|file)\b",
+        r"\b(tone|shorter|longer|more formal|less formal)\b",
+    ],
+    "insurance_questions": [
+        r"\b(covered|coverage|cover|deductible|premium|exclusions?|eligib\w*|reimburs\w*)\b",
+        r"\b(policy|plan|insurance|claim|benefits?|ohip|uhip)\b.*\?",
+        r"\b(how much|what is the (maximum|limit))\b",
+    ],
+}
+
+# Competing "none of the tools" anchor: BGE scores almost any pair of texts 0.6+, so a
+# tool only wins on embeddings if it beats this as well as every other tool
+NULL_DESCRIPTION = (
+    "other: a general question the tools do not handle, such as what an insurance "
+    "policy or plan covers, deductibles, premiums, claims, eligibility or benefits"
+)
+
+
+@dataclass
+class RouteDecision:
+    tool: Optional[str]          # None → fall back to the ReAct agent
+    confidence: float
+    method: str                  # "rules" | "embedding" | "fallback"
+    scores: Dict[str, float] = field(default_factory=dict)
+    elapsed_ms: float = 0.0
+
+
+def _cosine(a, b) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    na = math.sqrt(sum(x * x for x in a))
+    nb = math.sqrt(sum(y * y for y in b))
+    return dot / (na * nb) if na and nb else 0.0
+
+
+class IntentRouter:
+    """
+    Cheap routing in front of the agent: keyword rules first, then cosine
+    similarity between the query and each tool's description. Only routes
+    when confident; otherwise returns a fallback decision for the agent.
+
+    Rules for tools the server does not expose still count: a match means the
+    query belongs elsewhere and goes to the agent. Embedding routing needs at
+    least two tools and must beat the null description by `min_margin`.
+    """
+
+    def __init__(self, tool_descriptions: Dict[str, str], embeddings=None,
+                 rules: Dict[str, List[str]] = None, min_similarity: float = 0.75,
+                 min_margin: float = 0.05, null_description: str = NULL_DESCRIPTION):
+        self.tool_descriptions = tool_descriptions
+        self.embeddings = embeddings
+        self.min_similarity = min_similarity
+        self.min_margin = min_margin
+        rules = DEFAULT_RULES if rules is None else rules
+        self.rules = {
+            name: [re.compile(p, re.IGNORECASE) for p in patterns]
+            for name, patterns in rules.items()
+        }
+        self._tool_vectors = {}
+        self._null_vector = None
+        # With a single tool there is nothing to tell apart — leave it to rules and the agent
+        if embeddings is not None and len(tool_descriptions) > 1:
+            names = list(tool_descriptions)
+            vectors = embeddings.embed_documents(
+                [f"{n}: {tool_descriptions[n]}" for n in names] + [null_description]
+            )
+            self._tool_vectors = dict(zip(names, vectors))
+            self._null_vector = vectors[-1]
+        self.stats = Counter()
+        self._lock = threading.Lock()
+
+    def _by_rules(self, query: str) -> Optional[RouteDecision]:
+        hits = {
+            name: sum(1 for p in patterns if p.search(query))
+            for name, patterns in self.rules.items()
+        }
+        matched = [name for name, n in hits.items() if n]
+        if not matched:
+            return None
+        scores = {k: float(v) for k, v in hits.items()}
+        if len(matched) == 1 and matched[0] in self.tool_descriptions:
+            return RouteDecision(matched[0], 0.9, "rules", scores)
+        # Ambiguous, or clearly meant for a tool this server does not expose
+        return RouteDecision(None, 0.0, "fallback", scores)
+
+    def _by_embedding(self, query: str) -> Optional[RouteDecision]:
+        if not self._tool_vectors:
+            return None
+        qv = self.embeddings.embed_query(query)
+        scores = {name: _cosine(qv, vec) for name, vec in self._tool_vectors.items()}
+        ranked = sorted(scores.values(), reverse=True)
+        best = max(scores, key=scores.get)
+        scores["<none>"] = _cosine(qv, self._null_vector)
+        margin = ranked[0] - max(ranked[1], scores["<none>"])
+        if ranked[0] >= self.min_similarity and margin >= self.min_margin:
+            return RouteDecision(best, ranked[0], "embedding", scores)
+        return RouteDecision(None, ranked[0], "fallback", scores)
+
+    def route(self, query: str) -> RouteDecision:
+        started = time.perf_counter()
+        decision = self._by_rules(query) or self._by_embedding(query) \
+            or RouteDecision(None, 0.0, "fallback")
+        decision.elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.stats[decision.method] += 1
+            if decision.tool:
+                self.stats["llm_calls_saved"] += 1
+        print(
+            f"🧭 Route: {decision.tool or 'agent'} via {decision.method} "
+            f"(confidence={decision.confidence:.2f}, "
+            f"scores={ {k: round(v, 2) for k, v in decision.scores.items()} }, {decision.elapsed_ms:.1f} ms, "
+            f"LLM calls saved so far: {self.stats['llm_calls_saved']})"
+        )
+        return decision
@@ -1,22 +1,42 @@
+import os
 import requests
+from llm_cache import cached_call
 
-def ask_ollama(prompt: str) -> str:
+OLLAMA_MODEL = "llama3.2:latest"  # ← your exact model name from `ollama list`
+OLLAMA_BASE_URL = os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434")
+OLLAMA_TEMPERATURE = os.environ.get("OLLAMA_TEMPERATURE")  # set to "0" to enable response caching
+
+def _generate(prompt: str, options: dict) -> str:
+    payload = {
+        "model": OLLAMA_MODEL,
+        "prompt": prompt,
+        "stream": False
+    }
+    if options:
+        payload["options"] = options
+    response = requests.post(f"{OLLAMA_BASE_URL}/api/generate", json=payload)
+    response.raise_for_status()
+    data = response.json()
+    if "response" in data:
+        return data["response"]
+    print("⚠️ Unexpected response format from Ollama:", data)
+    return None
+
+def ask_ollama(prompt: str, temperature: float = None) -> str:
+    if temperature is None and OLLAMA_TEMPERATURE is not None:
+        temperature = float(OLLAMA_TEMPERATURE)
+    options = {"temperature": temperature} if temperature is not None else {}
     try:
-        response = requests.post(
-            "http://localhost:11434/api/generate",
-            json={
-                "model": "llama3.2:latest",  # ← your exact model name from `ollama list`
-                "prompt": prompt,
-                "stream": False
-            }
+        # Deterministic calls are served from / coalesced through the generation cache
+        result = cached_call(
+            OLLAMA_MODEL,
+            prompt,
+            lambda: _generate(prompt, options),
+            params=options
         )
-        response.raise_for_status()
-        data = response.json()
-        if "response" in data:
-            return data["response"]
-        else:
-            print("⚠️ Unexpected response format from Ollama:", data)
+        if result is None:
             return "Ollama didn't return a valid response."
+        return result
     except Exception as e:
         print("🔥 Error communicating with Ollama:", str(e))
         return "Failed to connect to Ollama or model not running."
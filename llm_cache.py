@@ -0,0 +1,251 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+# === Configuration ===
+# LLM_CACHE=memory | disk  (unset → caching disabled)
+LLM_CACHE = os.environ.get("LLM_CACHE", "").lower()
+LLM_CACHE_DIR = os.environ.get("LLM_CACHE_DIR", ".llm_cache")
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "1024"))
+LLM_CACHE_TTL = float(os.environ.get("LLM_CACHE_TTL", "0"))  # seconds, 0 = no expiry
+
+
+# === Storage backends ===
+class MemoryStore:
+    """In-process LRU store."""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            stored_at, value = item
+            if self.ttl and time.time() - stored_at > self.ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value) -> None:
+        with self._lock:
+            self._data[key] = (time.time(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class DiskStore:
+    """
+    One pickle file per key under `root`. A file's mtime is when it was stored
+    (for TTL); its atime is set on every hit and drives LRU eviction.
+    """
+
+    def __init__(self, root: str = ".llm_cache", max_entries: int = 1024, ttl: float = 0):
+        self.root = root
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self._entries = len(self)  # running count, so `set` does not rescan the directory
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.pkl")
+
+    def get(self, key: str):
+        path = self._path(key)
+        try:
+            stored_at = os.path.getmtime(path)
+            if self.ttl and time.time() - stored_at > self.ttl:
+                os.remove(path)
+                with self._lock:
+                    self._entries -= 1
+                return None
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+            os.utime(path, (time.time(), stored_at))  # mark as recently used, keep the store time
+            return value
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def set(self, key: str, value) -> None:
+        path = self._path(key)
+        is_new = not os.path.exists(path)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(value, f)
+        os.replace(tmp, path)
+        if not is_new:
+            return
+        with self._lock:
+            self._entries += 1
+            if self._entries <= self.max_entries:
+                return
+        self._evict()
+
+    def _evict(self) -> None:
+        # Evict an extra 10% so the directory scan happens once per many sets, not on each one
+        with self._lock:
+            entries = [e for e in os.scandir(self.root) if e.name.endswith(".pkl")]
+            target = self.max_entries - self.max_entries // 10
+            overflow = len(entries) - target
+            self._entries = len(entries)
+            if overflow <= 0:
+                return
+            entries.sort(key=lambda e: e.stat().st_atime)
+            for entry in entries[:overflow]:
+                try:
+                    os.remove(entry.path)
+                    self._entries -= 1
+                except FileNotFoundError:
+                    pass
+
+    def __len__(self):
+        return sum(1 for name in os.listdir(self.root) if name.endswith(".pkl"))
+
+
+# === Key construction ===
+def _normalize_message(msg):
+    """Reduce a LangChain message, dict or string to a stable, JSON-friendly form."""
+    if isinstance(msg, str):
+        return {"type": "human", "content": msg.strip()}
+    if isinstance(msg, dict):
+        return {k: msg[k] for k in sorted(msg)}
+    content = getattr(msg, "content", "")
+    if isinstance(content, str):
+        content = content.strip()
+    return {
+        "type": getattr(msg, "type", type(msg).__name__),
+        "content": content,
+        "tool_calls": [
+            {"name": c.get("name"), "args": c.get("args")}
+            for c in getattr(msg, "tool_calls", None) or []
+        ],
+        "tool_call_id": getattr(msg, "tool_call_id", None),
+    }
+
+
+def _normalize_tool(tool):
+    if isinstance(tool, dict):
+        return tool
+    schema = getattr(tool, "args", None)
+    return {"name": getattr(tool, "name", str(tool)), "args": schema}
+
+
+def make_key(model: str, messages, tools=None, params: dict = None) -> str:
+    """Hash of model, normalized messages, tool schema and sampling params."""
+    if isinstance(messages, (str, dict)) or not hasattr(messages, "__iter__"):
+        messages = [messages]
+    payload = {
+        "model": model,
+        "messages": [_normalize_message(m) for m in messages],
+        "tools": [_normalize_tool(t) for t in tools or []],
+        "params": params or {},
+    }
+    blob = json.dumps(payload, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def is_cacheable(params: dict) -> bool:
+    """Only deterministic (temperature 0) generations are cached."""
+    temperature = (params or {}).get("temperature")
+    return temperature is not None and float(temperature) == 0.0
+
+
+# === Cache with in-flight coalescing ===
+class _InFlight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class GenerationCache:
+    """
+    Response cache for LLM calls. Concurrent callers with the same key wait
+    for the first caller's result instead of issuing their own request.
+    """
+
+    def __init__(self, store=None):
+        self.store = store if store is not None else MemoryStore()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0}
+
+    def get_or_compute(self, key: str, compute):
+        cached = self.store.get(key)
+        if cached is not None:
+            self._count("hits")
+            return cached
+
+        with self._lock:
+            pending = self._inflight.get(key)
+            leader = pending is None
+            if leader:
+                # A leader may have stored its result and left since the check above
+                cached = self.store.get(key)
+                if cached is not None:
+                    self.stats["hits"] += 1
+                    return cached
+                pending = self._inflight[key] = _InFlight()
+                self.stats["misses"] += 1
+            else:
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            pending.event.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.value
+
+        try:
+            pending.value = compute()
+            if pending.value is not None:
+                self.store.set(key, pending.value)
+            return pending.value
+        except BaseException as e:
+            pending.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            pending.event.set()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+
+def _build_default_cache():
+    if LLM_CACHE == "memory":
+        return GenerationCache(MemoryStore(LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL))
+    if LLM_CACHE == "disk":
+        return GenerationCache(DiskStore(LLM_CACHE_DIR, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL))
+    return None
+
+
+default_cache = _build_default_cache()
+
+
+def cached_call(model: str, messages, compute, tools=None, params: dict = None, cache=None):
+    """
+    Run `compute()` through the generation cache when caching is enabled and
+    the call is deterministic; otherwise just call it.
+    """
+    cache = cache if cache is not None else default_cache
+    if cache is None or not is_cacheable(params):
+        return compute()
+    key = make_key(model, messages, tools=tools, params=params)
+    return cache.get_or_compute(key, compute)
@@ -0,0 +1,161 @@
+"""
+Minimal Ollama stand-in for load tests.
+
+Serves /api/chat, /api/generate and /api/tags with a configurable per-token
+latency. When the chat request carries tools, the reply is a tool call to the
+first tool (e.g. Drafter's `update`) so agent loops terminate normally.
+"""
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeOllamaConfig:
+    def __init__(self, token_latency: float = 0.02, first_token_latency: float = 0.1,
+                 tokens: int = 40, error_rate: float = 0.0):
+        self.token_latency = token_latency
+        self.first_token_latency = first_token_latency
+        self.tokens = tokens
+        self.error_rate = error_rate
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def next_request(self) -> int:
+        with self._lock:
+            self.requests += 1
+            return self.requests
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _reply_words(prompt: str, n: int) -> list:
+    words = (prompt.split() or ["ok"]) * (n // max(len(prompt.split()), 1) + 1)
+    return words[:n]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    config: FakeOllamaConfig = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._send_json(200, {"models": [{"name": "llama3.2:latest", "model": "llama3.2:latest"}]})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        n = self.config.next_request()
+        if self.config.error_rate and (n * 7919) % 1000 < self.config.error_rate * 1000:
+            self._send_json(500, {"error": "injected failure"})
+            return
+        if self.path == "/api/chat":
+            self._chat(body)
+        elif self.path == "/api/generate":
+            self._generate(body)
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def _final_fields(self, body: dict) -> dict:
+        return {
+            "model": body.get("model", "llama3.2"),
+            "created_at": _now(),
+            "done": True,
+            "done_reason": "stop",
+            "total_duration": 0,
+            "prompt_eval_count": 1,
+            "eval_count": self.config.tokens,
+        }
+
+    def _stream(self, chunks, final: dict) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for chunk in chunks:
+            self._write_chunk(chunk)
+        self._write_chunk(final)
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, chunk: dict) -> None:
+        data = (json.dumps(chunk) + "\n").encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _chat(self, body: dict) -> None:
+        messages = body.get("messages", [])
+        prompt = messages[-1].get("content", "") if messages else ""
+        words = _reply_words(prompt, self.config.tokens)
+        final = self._final_fields(body)
+
+        if body.get("tools"):
+            # Ollama returns tool calls in one message once generation finishes
+            time.sleep(self.config.first_token_latency + self.config.token_latency * len(words))
+            tool = body["tools"][0]["function"]
+            arg = next(iter(tool.get("parameters", {}).get("properties", {}) or {"content": None}))
+            final["message"] = {
+                "role": "assistant",
+                "content": "",
+                "tool_calls": [{"function": {"name": tool["name"], "arguments": {arg: " ".join(words)}}}],
+            }
+            if body.get("stream", True):
+                self._stream([], final)
+            else:
+                self._send_json(200, final)
+            return
+
+        if not body.get("stream", True):
+            time.sleep(self.config.first_token_latency + self.config.token_latency * len(words))
+            final["message"] = {"role": "assistant", "content": " ".join(words)}
+            self._send_json(200, final)
+            return
+
+        def chunks():
+            time.sleep(self.config.first_token_latency)
+            for word in words:
+                time.sleep(self.config.token_latency)
+                yield {"model": body.get("model"), "created_at": _now(),
+                       "message": {"role": "assistant", "content": word + " "}, "done": False}
+
+        final["message"] = {"role": "assistant", "content": ""}
+        self._stream(chunks(), final)
+
+    def _generate(self, body: dict) -> None:
+        words = _reply_words(body.get("prompt", ""), self.config.tokens)
+        if not body.get("stream", True):
+            time.sleep(self.config.first_token_latency + self.config.token_latency * len(words))
+            self._send_json(200, {**self._final_fields(body), "response": " ".join(words)})
+            return
+
+        def chunks():
+            time.sleep(self.config.first_token_latency)
+            for word in words:
+                time.sleep(self.config.token_latency)
+                yield {"model": body.get("model"), "created_at": _now(), "response": word + " ", "done": False}
+
+        self._stream(chunks(), {**self._final_fields(body), "response": ""})
+
+
+def start_fake_ollama(config: FakeOllamaConfig, host: str = "127.0.0.1", port: int = 0):
+    """Start the fake server in a daemon thread; returns (server, base_url)."""
+    handler = type("FakeOllamaHandler", (_Handler,), {"config": config})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-ollama", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
@@ -0,0 +1,23 @@
+"""
+In-process stand-in for `BasicMCPClient`: calls the Drafter MCP server's tools
+directly through FastMCP's tool manager, skipping the SSE transport.
+"""
+from types import SimpleNamespace
+
+
+class InProcessMCPClient:
+
+    def __init__(self, url: str = None, server=None):
+        if server is None:
+            from drafter1 import mcp as server
+        self.server = server
+
+    async def call_tool(self, tool_name: str, arguments: dict, *args, **kwargs):
+        result = await self.server.call_tool(tool_name, arguments)
+        # Newer FastMCP versions return (content, structured_output)
+        if isinstance(result, tuple):
+            result = result[0]
+        return SimpleNamespace(content=list(result), isError=False)
+
+    async def list_tools(self):
+        return SimpleNamespace(tools=await self.server.list_tools())
@@ -0,0 +1,238 @@
+"""
+Load-replay / soak harness for the /ask API.
+
+    # 5 req/s Poisson for a minute against client1.app in-process, fake Ollama + in-process MCP
+    python -m loadtest.run --arrivals poisson --rate 5 --duration 60
+
+    # replay a recording at 4x speed
+    python -m loadtest.run --arrivals replay --records ask_traffic.jsonl --speed 4
+
+    # one-hour soak with bursts, watching memory growth
+    python -m loadtest.run --arrivals burst --rate 2 --burst-rate 20 --duration 3600 --tracemalloc
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import time
+import tracemalloc
+
+from loadtest.fake_ollama import FakeOllamaConfig, start_fake_ollama
+from loadtest.traffic import (assign_requests, burst_arrivals, load_records,
+                              poisson_arrivals, replay_arrivals)
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # ru_maxrss is peak, not current — best effort on other Unix hosts
+        try:
+            import resource
+        except ImportError:  # Windows
+            return 0
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Results:
+    def __init__(self):
+        self.latencies = []
+        self.statuses = {}
+        self.errors = {}
+        self.memory = []
+        self.sent = 0
+        self.completed = 0
+
+    def record(self, latency: float, status, error: str = None) -> None:
+        self.completed += 1
+        self.statuses[str(status)] = self.statuses.get(str(status), 0) + 1
+        if error is None:
+            self.latencies.append(latency)
+        else:
+            self.errors[error] = self.errors.get(error, 0) + 1
+
+    def report(self, elapsed: float, snapshot_diff=None) -> dict:
+        failed = sum(self.errors.values())
+        report = {
+            "elapsed_seconds": round(elapsed, 3),
+            "sent": self.sent,
+            "completed": self.completed,
+            "throughput_rps": round(self.completed / elapsed, 3) if elapsed else 0.0,
+            "error_rate": round(failed / self.completed, 4) if self.completed else 0.0,
+            "statuses": self.statuses,
+            "errors": self.errors,
+            "latency_ms": {
+                name: round(percentile(self.latencies, pct) * 1000, 2)
+                for name, pct in (("p50", 50), ("p90", 90), ("p95", 95), ("p99", 99), ("max", 100))
+            },
+        }
+        if self.memory:
+            first, last = self.memory[0], self.memory[-1]
+            requests_between = max(last["completed"] - first["completed"], 1)
+            report["memory"] = {
+                "rss_start_mb": round(first["rss"] / 2**20, 2),
+                "rss_end_mb": round(last["rss"] / 2**20, 2),
+                "rss_growth_mb": round((last["rss"] - first["rss"]) / 2**20, 2),
+                "rss_growth_kb_per_1k_requests": round((last["rss"] - first["rss"]) / 1024 / requests_between * 1000, 2),
+                "samples": self.memory,
+            }
+        if snapshot_diff:
+            report["top_allocation_growth"] = snapshot_diff
+        return report
+
+
+async def _sample_memory(results: Results, started: float, every: float) -> None:
+    while True:
+        sample = {"t": round(time.perf_counter() - started, 2), "rss": rss_bytes(), "completed": results.completed}
+        if tracemalloc.is_tracing():
+            sample["traced"] = tracemalloc.get_traced_memory()[0]
+        results.memory.append(sample)
+        await asyncio.sleep(every)
+
+
+async def _send(client, body: dict, results: Results, timeout: float) -> None:
+    started = time.perf_counter()
+    try:
+        response = await client.post("/ask", json=body, timeout=timeout)
+        error = None if response.status_code < 400 else f"HTTP {response.status_code}"
+        results.record(time.perf_counter() - started, response.status_code, error)
+    except Exception as e:
+        results.record(time.perf_counter() - started, "exception", type(e).__name__)
+
+
+async def warm_up(client, schedule, count: int, timeout: float) -> None:
+    """Send a few untimed requests first so lazy imports (drafter1, langgraph) don't read as a leak."""
+    if not schedule or count <= 0:
+        return
+    query = schedule[0][1]["query"]
+    for n in range(count):
+        body = {"query": query, "user_id": "loadtest-warmup", "thread_id": f"warmup-{n}"}
+        try:
+            await client.post("/ask", json=body, timeout=timeout)
+        except Exception as e:
+            print(f"⚠️ Warm-up request failed: {type(e).__name__}")
+
+
+async def drive(schedule, client, results: Results, sample_every: float, timeout: float) -> float:
+    """Open-loop driver: every request is fired at its scheduled offset regardless of backlog."""
+    started = time.perf_counter()
+    sampler = asyncio.create_task(_sample_memory(results, started, sample_every))
+    tasks = []
+    for offset, body in schedule:
+        delay = started + offset - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        results.sent += 1
+        tasks.append(asyncio.create_task(_send(client, body, results, timeout)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    sampler.cancel()
+    results.memory.append({"t": round(elapsed, 2), "rss": rss_bytes(), "completed": results.completed})
+    return elapsed
+
+
+def build_schedule(args) -> list:
+    records = load_records(args.records) if args.records else []
+    if args.arrivals == "replay":
+        if not records:
+            raise SystemExit("--arrivals replay needs --records")
+        times = replay_arrivals(records, args.speed)
+    elif args.arrivals == "burst":
+        times = burst_arrivals(args.rate, args.duration, args.burst_rate, args.burst_every,
+                               args.burst_length, args.seed)
+    else:
+        times = poisson_arrivals(args.rate, args.duration, args.seed)
+    return assign_requests(times, records, args.seed, args.threads, args.turns_per_thread)
+
+
+def make_client(args):
+    import httpx
+
+    if args.url:
+        return httpx.AsyncClient(base_url=args.url)
+
+    # In-process: client1.app with its MCP client swapped for a direct call into drafter1
+    import client1
+    from loadtest.inproc_mcp import InProcessMCPClient
+    client1.BasicMCPClient = InProcessMCPClient
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=client1.app), base_url="http://loadtest")
+
+
+async def main_async(args) -> dict:
+    schedule = build_schedule(args)
+    print(f"🚦 {len(schedule)} requests scheduled ({args.arrivals})")
+    results = Results()
+    async with make_client(args) as client:
+        await warm_up(client, schedule, args.warmup, args.timeout)
+        # Memory baselines are taken after warm-up, once the app is fully imported
+        if args.tracemalloc:
+            tracemalloc.start(10)
+        baseline = tracemalloc.take_snapshot() if args.tracemalloc else None
+        elapsed = await drive(schedule, client, results, args.sample_every, args.timeout)
+
+    diff = None
+    if baseline is not None:
+        stats = tracemalloc.take_snapshot().compare_to(baseline, "lineno")[:10]
+        diff = [{"where": str(s.traceback), "size_diff_kb": round(s.size_diff / 1024, 1), "count_diff": s.count_diff}
+                for s in stats]
+    return results.report(elapsed, diff)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-replay / soak harness for /ask")
+    parser.add_argument("--arrivals", choices=["poisson", "burst", "replay"], default="poisson")
+    parser.add_argument("--records", help="JSONL recording of /ask traffic")
+    parser.add_argument("--rate", type=float, default=2.0, help="baseline requests/second")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of generated traffic")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier")
+    parser.add_argument("--burst-rate", type=float, default=20.0)
+    parser.add_argument("--burst-every", type=float, default=10.0)
+    parser.add_argument("--burst-length", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--threads", type=int, default=8, help="synthetic conversation threads")
+    parser.add_argument("--turns-per-thread", type=int, default=0,
+                        help="retire a thread after this many turns (0 = reuse for the whole run)")
+    parser.add_argument("--warmup", type=int, default=2, help="untimed requests before measuring")
+    parser.add_argument("--url", help="hit a running server instead of client1.app in-process")
+    parser.add_argument("--ollama-url", help="use a real Ollama instead of the fake one")
+    parser.add_argument("--token-latency", type=float, default=0.02, help="fake Ollama seconds per token")
+    parser.add_argument("--first-token-latency", type=float, default=0.1)
+    parser.add_argument("--tokens", type=int, default=40, help="fake Ollama tokens per reply")
+    parser.add_argument("--ollama-error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--sample-every", type=float, default=5.0, help="memory sampling interval (s)")
+    parser.add_argument("--tracemalloc", action="store_true", help="report top allocation growth")
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args()
+
+    if not args.ollama_url and not args.url:
+        config = FakeOllamaConfig(args.token_latency, args.first_token_latency, args.tokens, args.ollama_error_rate)
+        _, base_url = start_fake_ollama(config)
+        os.environ["OLLAMA_BASE_URL"] = base_url  # read by drafter1 / llama_model at import
+        print(f"🤖 Fake Ollama on {base_url}")
+    elif args.ollama_url:
+        os.environ["OLLAMA_BASE_URL"] = args.ollama_url
+
+    report = asyncio.run(main_async(args))
+    summary = {k: v for k, v in report.items() if k != "memory"}
+    if "memory" in report:
+        summary["memory"] = {k: v for k, v in report["memory"].items() if k != "samples"}
+    print(json.dumps(summary, indent=2))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Report written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
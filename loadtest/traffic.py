@@ -0,0 +1,97 @@
+"""
+/ask traffic records and arrival schedules.
+
+Record format (JSON lines, one request per line):
+    {"t": 0.42, "query": "...", "user_id": "Anna", "thread_id": "payment-delay"}
+`t` is seconds since the start of the recording.
+"""
+import json
+import random
+import threading
+import time
+from collections import Counter
+
+_record_lock = threading.Lock()
+_record_started = {}
+
+
+def append_record(path: str, query: str, user_id: str, thread_id: str) -> None:
+    """Append one /ask request to a recording file (used by client1 when ASK_RECORD_FILE is set)."""
+    with _record_lock:
+        started = _record_started.setdefault(path, time.time())
+        record = {"t": round(time.time() - started, 4), "query": query,
+                  "user_id": user_id, "thread_id": thread_id}
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def load_records(path: str) -> list:
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                records.append(json.loads(line))
+    return sorted(records, key=lambda r: r.get("t", 0))
+
+
+def save_records(path: str, records) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+# === Arrival generators (open loop: send times never depend on responses) ===
+def poisson_arrivals(rate: float, duration: float, seed: int = None) -> list:
+    """Send offsets for a Poisson process with `rate` requests/second."""
+    rng = random.Random(seed)
+    times, t = [], rng.expovariate(rate)
+    while t < duration:
+        times.append(t)
+        t += rng.expovariate(rate)
+    return times
+
+
+def burst_arrivals(rate: float, duration: float, burst_rate: float, burst_every: float,
+                   burst_length: float, seed: int = None) -> list:
+    """Poisson baseline at `rate` with `burst_rate` spikes of `burst_length` s every `burst_every` s."""
+    times = poisson_arrivals(rate, duration, seed)
+    start, n = burst_every, 0
+    while start < duration:
+        length = min(burst_length, duration - start)
+        times.extend(start + t for t in poisson_arrivals(burst_rate, length, None if seed is None else seed + n + 1))
+        start += burst_every
+        n += 1
+    return sorted(times)
+
+
+def replay_arrivals(records, speed: float = 1.0) -> list:
+    """Send offsets from a recording, compressed or stretched by `speed`."""
+    return [r.get("t", 0) / speed for r in records]
+
+
+def assign_requests(times, records, seed: int = None, threads: int = 8, turns_per_thread: int = 0) -> list:
+    """
+    Pair every send time with a request body. Recorded requests are reused
+    round-robin with their own thread ids; without a recording, `threads`
+    synthetic threads take turns at random. Thread ids are reused for the whole
+    run so per-thread history keeps growing, like real long-lived sessions.
+    With `turns_per_thread` > 0 a thread is retired after that many turns and
+    continues under a fresh id (`<thread>-1`, `<thread>-2`, ...).
+    """
+    rng = random.Random(seed)
+    pool = list(records) or [{"query": "Draft a short email about a claim delay",
+                              "user_id": "loadtest", "thread_id": f"thread-{n}"}
+                             for n in range(max(threads, 1))]
+    turns = Counter()
+    schedule = []
+    for i, t in enumerate(times):
+        base = pool[i % len(pool)] if records else rng.choice(pool)
+        user_id = base.get("user_id", "loadtest")
+        thread_id = base.get("thread_id", "thread")
+        key = (user_id, thread_id)
+        if turns_per_thread:
+            thread_id = f"{thread_id}-{turns[key] // turns_per_thread}"
+        turns[key] += 1
+        schedule.append((t, {"query": base["query"], "user_id": user_id, "thread_id": thread_id}))
+    return schedule
@@ -1,7 +1,56 @@
+import threading
 from langchain.vectorstores import Chroma
-from embeddings import load_bge_model
+from embedding_service import get_embedding_service
+from index_store import current_snapshot, current_snapshot_path, load_partitions
+from doc_tags import build_where
 
-def get_relevant_documents(query, k=3):
-    model = load_bge_model()
-    db = Chroma(persist_directory="db", embedding_function=model)
+_dbs = {}
+_db_path = None
+_partitions = {}
+_db_lock = threading.Lock()
+
+def _open_db(provider=None):
+    """
+    (db, partitioned) for the live snapshot. The partition map and the db are
+    read under one lock so a concurrent snapshot swap can't mix them up.
+    `partitioned` is True when the provider's own partition was opened.
+    """
+    global _dbs, _db_path, _partitions
+    path = current_snapshot_path()
+    with _db_lock:
+        # Re-open only when ingestion has swapped the CURRENT snapshot
+        if path != _db_path:
+            _dbs, _db_path, _partitions = {}, path, load_partitions(path)
+        collection_name = _partitions.get(provider) if provider else None
+        db = _dbs.get(collection_name)
+        if db is None:
+            kwargs = {"collection_name": collection_name} if collection_name else {}
+            db = Chroma(persist_directory=path, embedding_function=get_embedding_service(), **kwargs)
+            _dbs[collection_name] = db
+        return db, collection_name is not None
+
+def _route(filters):
+    """
+    A single-provider filter is served from that provider's partition; any
+    other filters become a pre-filtered search on the chosen collection.
+    """
+    filters = dict(filters or {})
+    if filters and current_snapshot() is None:
+        # The legacy flat db/ predates provider tags, so any filter would silently match nothing
+        raise ValueError("Filtered retrieval needs a tagged index snapshot; re-run ingest.py")
+    provider = filters.get("provider")
+    db, partitioned = _open_db(provider if isinstance(provider, str) else None)
+    if partitioned:
+        del filters["provider"]
+    return db, build_where(filters)
+
+def get_relevant_documents(query, k=3, filters=None):
+    """
+    filters: optional dict over provider / product / doc_type / page,
+    e.g. {"provider": "CIBC"} or {"provider": ["Manulife", "Sun Life"], "doc_type": "webpage"}.
+    """
+    # Query embeddings go through the shared micro-batching service
+    db, where = _route(filters)
+    if where:
+        return db.similarity_search(query, k=k, filter=where)
     return db.similarity_search(query, k=k)
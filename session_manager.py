@@ -0,0 +1,189 @@
+"""
+Memory-bounded per-thread conversation storage for the Drafter agent.
+
+Messages are kept as compact (optionally zlib-compressed) JSON blobs, deduplicated
+by message id. Each session is capped in message count and bytes; when the
+total held in memory exceeds the global cap, least recently used sessions are
+spilled to disk and rehydrated lazily on their next turn.
+"""
+import json
+import os
+import re
+import threading
+import uuid
+import zlib
+from collections import OrderedDict
+
+from langchain_core.messages import message_to_dict, messages_from_dict
+
+SESSION_MAX_MESSAGES = int(os.environ.get("SESSION_MAX_MESSAGES", "40"))
+SESSION_MAX_BYTES = int(os.environ.get("SESSION_MAX_BYTES", str(256 * 1024)))
+SESSIONS_MAX_BYTES = int(os.environ.get("SESSIONS_MAX_BYTES", str(64 * 1024 * 1024)))
+SESSIONS_DIR = os.environ.get("SESSIONS_DIR", ".sessions")
+COMPRESS_OVER = 512  # bytes
+
+_RAW, _ZLIB = b"j", b"z"
+
+
+def _pack(data: dict) -> bytes:
+    raw = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    if len(raw) > COMPRESS_OVER:
+        return _ZLIB + zlib.compress(raw)
+    return _RAW + raw
+
+
+def _encode(message) -> bytes:
+    data = message_to_dict(message)
+    # Drop empty fields (additional_kwargs={}, tool_calls=[] ...) — they dominate short messages
+    data["data"] = {k: v for k, v in data["data"].items() if v or k == "content"}
+    return _pack(data)
+
+
+def _decode(blob: bytes) -> dict:
+    raw = zlib.decompress(blob[1:]) if blob[:1] == _ZLIB else blob[1:]
+    return json.loads(raw)
+
+
+class _Session:
+    __slots__ = ("entries", "ids", "nbytes")
+
+    def __init__(self):
+        self.entries = []  # [(message_id, type, blob)]
+        self.ids = set()
+        self.nbytes = 0
+
+
+class SessionManager:
+
+    def __init__(self, directory: str = SESSIONS_DIR, max_messages: int = SESSION_MAX_MESSAGES,
+                 max_session_bytes: int = SESSION_MAX_BYTES, max_total_bytes: int = SESSIONS_MAX_BYTES):
+        self.directory = directory
+        self.max_messages = max_messages
+        self.max_session_bytes = max_session_bytes
+        self.max_total_bytes = max_total_bytes
+        self._live = OrderedDict()  # thread_id → _Session, LRU order
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.counters = {"evictions": 0, "rehydrations": 0, "trimmed_messages": 0, "duplicates_skipped": 0}
+        os.makedirs(directory, exist_ok=True)
+
+    # === Public API ===
+    def get(self, thread_id: str) -> list:
+        """Conversation history for a thread (rehydrated from disk if evicted)."""
+        with self._lock:
+            session = self._touch(thread_id, create=False)
+            if session is None:
+                return []
+            return messages_from_dict([_decode(blob) for _, _, blob in session.entries])
+
+    def append(self, thread_id: str, messages) -> None:
+        """Store new messages; ones already held (same id) are skipped."""
+        with self._lock:
+            session = self._touch(thread_id, create=True)
+            for message in messages:
+                message_id = getattr(message, "id", None) or str(uuid.uuid4())
+                if message_id in session.ids:
+                    self.counters["duplicates_skipped"] += 1
+                    continue
+                if getattr(message, "id", None) is None:
+                    message.id = message_id
+                blob = _encode(message)
+                session.entries.append((message_id, message.type, blob))
+                session.ids.add(message_id)
+                session.nbytes += len(blob)
+                self._bytes += len(blob)
+            self._trim(session)
+            self._enforce_global_cap(keep=thread_id)
+
+    def drop(self, thread_id: str) -> None:
+        with self._lock:
+            session = self._live.pop(thread_id, None)
+            if session is not None:
+                self._bytes -= session.nbytes
+            try:
+                os.remove(self._path(thread_id))
+            except FileNotFoundError:
+                pass
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "live_sessions": len(self._live),
+                "bytes_held": self._bytes,
+                "evicted_sessions": sum(1 for n in os.listdir(self.directory) if n.endswith(".json")),
+                **self.counters,
+            }
+
+    # === Internals ===
+    def _path(self, thread_id: str) -> str:
+        safe = re.sub(r"[^\w.\-]", "_", thread_id)[:100]
+        digest = format(zlib.crc32(thread_id.encode("utf-8")), "08x")
+        return os.path.join(self.directory, f"{safe}-{digest}.json")
+
+    def _touch(self, thread_id: str, create: bool):
+        session = self._live.get(thread_id)
+        if session is None:
+            session = self._rehydrate(thread_id)
+            if session is None:
+                if not create:
+                    return None
+                session = _Session()
+            self._live[thread_id] = session
+        self._live.move_to_end(thread_id)
+        return session
+
+    def _trim(self, session: _Session) -> None:
+        def drop_oldest():
+            _, _, blob = session.entries.pop(0)
+            session.nbytes -= len(blob)
+            self._bytes -= len(blob)
+            self.counters["trimmed_messages"] += 1
+
+        while session.entries and (len(session.entries) > self.max_messages
+                                   or session.nbytes > self.max_session_bytes):
+            drop_oldest()
+        # A tool result without its AI tool call is invalid model input
+        while session.entries and session.entries[0][1] == "tool":
+            drop_oldest()
+        session.ids = {message_id for message_id, _, _ in session.entries}
+
+    def _enforce_global_cap(self, keep: str) -> None:
+        while self._bytes > self.max_total_bytes and len(self._live) > 1:
+            thread_id = next(iter(self._live))
+            if thread_id == keep:
+                self._live.move_to_end(thread_id)
+                continue
+            self._evict(thread_id)
+
+    def _evict(self, thread_id: str) -> None:
+        session = self._live.pop(thread_id)
+        self._bytes -= session.nbytes
+        path = self._path(thread_id)
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"thread_id": thread_id,
+                       "messages": [_decode(blob) for _, _, blob in session.entries]}, f)
+        os.replace(tmp, path)
+        self.counters["evictions"] += 1
+
+    def _rehydrate(self, thread_id: str):
+        path = self._path(thread_id)
+        try:
+            with open(path, encoding="utf-8") as f:
+                stored = json.load(f)
+        except FileNotFoundError:
+            return None
+        os.remove(path)
+        session = _Session()
+        for data in stored["messages"]:
+            blob = _pack(data)
+            message_id = data["data"].get("id") or str(uuid.uuid4())
+            session.entries.append((message_id, data["type"], blob))
+            session.ids.add(message_id)
+            session.nbytes += len(blob)
+        self._bytes += session.nbytes
+        self.counters["rehydrations"] += 1
+        return session
+
+
+sessions = SessionManager()
@@ -7,12 +7,15 @@ from llama_index.tools.mcp import BasicMCPClient, McpToolSpec
 from llama_index.core.agent.workflow import ReActAgent
 from llama_index.llms.ollama import Ollama
 from prompt_templates import BANK_CHATBOT_PROMPT
+from intent_router import IntentRouter
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 
 # Configuration
 MCP_URL = os.environ.get("MCP_URL", "http://127.0.0.1:3009/sse")
 MODEL_NAME = os.environ.get("LLM_MODEL", "llama3.2")
 TEMPERATURE = float(os.environ.get("LLM_TEMPERATURE", "0.7"))
+ROUTER_EMBEDDINGS = os.environ.get("ROUTER_EMBEDDINGS", "1") == "1"
 
 # FastAPI app
 app = FastAPI()
@@ -27,6 +30,8 @@ app.add_middleware(
 )
 
 agent = None
+router = None
+tools_by_name = {}
 
 # Request body
 class Query(BaseModel):
@@ -35,7 +40,7 @@ class Query(BaseModel):
 
 @app.on_event("startup")
 async def initialize_agent():
-    global agent
+    global agent, router, tools_by_name
     try:
         print(f"🔌 Connecting to MCP server at {MCP_URL}")
         mcp_client = BasicMCPClient(MCP_URL)
@@ -61,6 +66,17 @@ async def initialize_agent():
             stream=False
         )
 
+        # Fast path: keyword rules + embedding similarity over tool descriptions
+        tools_by_name = {tool.metadata.name: tool for tool in tools}
+        embeddings = None
+        if ROUTER_EMBEDDINGS:
+            from embedding_service import get_embedding_service
+            embeddings = get_embedding_service()
+        router = IntentRouter(
+            {name: tool.metadata.description or "" for name, tool in tools_by_name.items()},
+            embeddings=embeddings
+        )
+
         print("✅ Agent initialized.")
     except Exception as e:
         print(f"❌ Error during setup: {e}")
@@ -70,22 +86,52 @@ async def initialize_agent():
 async def ping():
     return {"status": "BankBot is alive"}
 
+@app.get("/router/stats")
+async def router_stats():
+    return dict(router.stats) if router else {}
+
+@app.get("/embeddings/stats")
+async def embedding_stats():
+    # Batch-size and queue-wait histograms of the shared query embedding service
+    if not ROUTER_EMBEDDINGS:
+        return {}
+    from embedding_service import get_embedding_service
+    return get_embedding_service().metrics()
+
+def tool_arguments(tool_name: str, data: Query) -> dict:
+    # Map the request onto whichever input field the tool expects
+    fields = getattr(tools_by_name[tool_name].metadata.fn_schema, "model_fields", {})
+    if "user_instruction" in fields:
+        arguments = {"user_instruction": data.query}
+        if "thread_id" in fields:
+            arguments["thread_id"] = data.thread_id
+        return arguments
+    if "query" in fields:
+        return {"query": data.query}
+    return {"input": data.query}
+
 @app.post("/ask")
 async def ask_query(data: Query):
     print(f"📨 Incoming query: {data.query} (thread_id: {data.thread_id})")
     try:
+        # Embedding lookup may block, keep it off the event loop
+        decision = await run_in_threadpool(router.route, data.query) if router else None
+
+        if decision is None or decision.tool is None:
+            # Low confidence → full ReAct reasoning pass
+            response = await agent.run(user_msg=data.query)
+            return {"response": str(response), "route": "agent"}
+
         mcp_client = BasicMCPClient(MCP_URL)
 
         response = await mcp_client.call_tool(
-            "drafter_tool",
-            {"user_instruction": data.query},
-            {"configurable": {"thread_id": data.thread_id}}
+            decision.tool,
+            tool_arguments(decision.tool, data)
         )
 
         print(f"🧾 MCP tool response: {response}")
-        print(f"🔎 Dir: {dir(response)}")
 
-        return {"response": str(response)}
+        return {"response": str(response), "route": decision.tool}
 
     except Exception as e:
         print(f"🛑 Error processing query: {e}")
@@ -8,30 +8,34 @@ from langgraph.prebuilt import ToolNode
 from langchain_ollama import ChatOllama
 from fastapi.concurrency import run_in_threadpool
 from mcp.server.fastmcp import FastMCP
-import os, uuid, json
+import os, uuid, zlib
 from datetime import datetime
+from draft_store import get_draft_store, safe_component
 
 # === MCP Server ===
 mcp = FastMCP("DrafterService", port=3009)
 
 # === Versioned Storage ===
+# Write-behind, journaled store sandboxed to BASE_DIR/<user_id>/
 BASE_DIR = "my_dir"
-os.makedirs(BASE_DIR, exist_ok=True)
+store = get_draft_store(BASE_DIR)
 
-def user_path(user_id: str):
-    path = os.path.join(BASE_DIR, user_id)
-    os.makedirs(path, exist_ok=True)
-    return path
+def thread_key(thread_id: str):
+    # File-name prefix for a thread; ids that needed sanitizing get a hash so "a/b" and "a_b" stay apart
+    safe = safe_component(thread_id)
+    if safe != thread_id:
+        safe = f"{safe}-{zlib.crc32(thread_id.encode('utf-8')):08x}"
+    return safe
 
-def current_file(user_id: str, thread_id: str):
-    return os.path.join(user_path(user_id), f"{thread_id}_current.json")
+def current_name(thread_id: str):
+    return f"{thread_key(thread_id)}_current.json"
 
-def version_file(user_id: str, thread_id: str, version_id: str):
-    return os.path.join(user_path(user_id), f"{thread_id}_{version_id}.json")
+def version_name(thread_id: str, version_id: str):
+    return f"{thread_key(thread_id)}_{version_id}.json"
 
-def save_version(user_id: str, thread_id: str, content: str) -> str:
+def save_version(user_id: str, thread_id: str, content: str, durability: str = None) -> str:
     version_id = datetime.now().strftime("v%Y%m%d_%H%M%S")
-    file_path = version_file(user_id, thread_id, version_id)
+    name = version_name(thread_id, version_id)
     data = {
         "content": content,
         "created_at": datetime.now().isoformat(),
@@ -39,34 +43,27 @@ def save_version(user_id: str, thread_id: str, content: str) -> str:
         "user_id": user_id,
         "thread_id": thread_id
     }
-    with open(file_path, "w") as f:
-        json.dump(data, f)
-    with open(current_file(user_id, thread_id), "w") as f:
-        json.dump({"current": file_path}, f)
+    store.write_json(user_id, name, data, durability)
+    store.write_json(user_id, current_name(thread_id), {"current": name}, durability)
     return version_id
 
 def load_current(user_id: str, thread_id: str):
-    path = current_file(user_id, thread_id)
-    if not os.path.exists(path):
+    pointer = store.read_json(user_id, current_name(thread_id))
+    if not pointer:
         return None
-    with open(path) as f:
-        pointer = json.load(f)["current"]
-    if os.path.exists(pointer):
-        with open(pointer) as vf:
-            return json.load(vf)
-    return None
+    # Older pointers hold a full path; only the file name is meaningful
+    return store.read_json(user_id, os.path.basename(pointer["current"]))
 
 def list_versions(user_id: str, thread_id: str):
     return sorted([
-        f for f in os.listdir(user_path(user_id))
-        if f.startswith(thread_id + "_v") and f.endswith(".json")
+        f for f in store.list(user_id)
+        if f.startswith(thread_key(thread_id) + "_v") and f.endswith(".json")
     ])
 
 def restore_version(user_id: str, thread_id: str, version_id: str):
-    path = version_file(user_id, thread_id, version_id)
-    if os.path.exists(path):
-        with open(current_file(user_id, thread_id), "w") as f:
-            json.dump({"current": path}, f)
+    name = version_name(thread_id, version_id)
+    if store.read_text(user_id, name) is not None:
+        store.write_json(user_id, current_name(thread_id), {"current": name})
         return True
     return False
 
@@ -89,9 +86,11 @@ def save(filename: str, user_id: str, thread_id: str) -> str:
         return "❌ No draft found."
     if not filename.endswith(".txt"):
         filename += ".txt"
-    with open(filename, "w") as f:
-        f.write(current["content"])
-    return f"💾 Saved as '{filename}'"
+    try:
+        path = store.write_text(user_id, filename, current["content"])
+    except ValueError as e:
+        return f"❌ Invalid filename: {e}"
+    return f"💾 Saved as '{path}'"
 
 @tool
 def get_draft(user_id: str, thread_id: str) -> str:
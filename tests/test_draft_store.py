@@ -0,0 +1,99 @@
+import os
+import threading
+
+import draft_store
+from draft_store import DraftStore
+
+
+def test_journal_is_replayed_after_crash(tmp_path):
+    root = tmp_path / "drafts"
+    root.mkdir()
+    # A journal left behind by a process that died before materializing
+    (root / draft_store.JOURNAL_NAME).write_text(
+        '{"path": "Anna/a.txt", "data": "first"}\n'
+        '{"path": "Anna/a.txt", "data": "second"}\n'
+        '{"path": "Bob/b.txt", "data": "bob"}\n'
+        '{"path": "Bob/torn.txt", "da',
+        encoding="utf-8",
+    )
+    store = DraftStore(str(root))
+    try:
+        assert store.read_text("Anna", "a.txt") == "second"
+        assert store.read_text("Bob", "b.txt") == "bob"
+        assert store.read_text("Bob", "torn.txt") is None
+        assert os.path.getsize(store.journal_path) == 0
+    finally:
+        store.close()
+
+
+def test_concurrent_writes_are_all_materialized(tmp_path):
+    store = DraftStore(str(tmp_path))
+    threads = [
+        threading.Thread(target=store.write_text, args=(f"user{i % 4}", f"d{i}.txt", str(i)))
+        for i in range(40)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    store.flush()
+    store.close()
+    for i in range(40):
+        with open(os.path.join(tmp_path, f"user{i % 4}", f"d{i}.txt"), encoding="utf-8") as f:
+            assert f.read() == str(i)
+
+
+def test_failed_apply_blocks_checkpoint_and_survives_restart(tmp_path, monkeypatch):
+    monkeypatch.setattr(draft_store, "JOURNAL_CHECKPOINT_BYTES", 1)
+    monkeypatch.setattr(draft_store, "APPLY_RETRY_SECONDS", 60)  # keep the retry out of the way
+    store = DraftStore(str(tmp_path))
+    materialize = store._materialize
+    failures = []
+
+    def flaky(relpath, data, sync):
+        if relpath.endswith("lost.txt") and not failures:
+            failures.append(relpath)
+            raise OSError("disk hiccup")
+        materialize(relpath, data, sync)
+
+    store._materialize = flaky
+    store.write_text("Anna", "lost.txt", "keep me", durability="journal")
+    store.flush()
+    store.write_text("Anna", "other.txt", "x", durability="journal")
+    store.flush()
+
+    assert failures
+    assert os.path.getsize(store.journal_path) > 0  # checkpoint must not drop the failed record
+    assert store.read_text("Anna", "lost.txt") == "keep me"
+
+    # Simulate a crash: stop the flusher without letting it retry
+    store._failed.clear()
+    store.close()
+    store = DraftStore(str(tmp_path))
+    try:
+        assert store.read_text("Anna", "lost.txt") == "keep me"
+        assert os.path.exists(os.path.join(tmp_path, "Anna", "lost.txt"))
+    finally:
+        store.close()
+
+
+def test_failed_apply_is_retried(tmp_path, monkeypatch):
+    monkeypatch.setattr(draft_store, "APPLY_RETRY_SECONDS", 0.01)
+    store = DraftStore(str(tmp_path))
+    materialize = store._materialize
+    attempts = []
+
+    def flaky(relpath, data, sync):
+        attempts.append(relpath)
+        if len(attempts) == 1:
+            raise OSError("disk hiccup")
+        materialize(relpath, data, sync)
+
+    store._materialize = flaky
+    store.write_text("Anna", "retry.txt", "hello")
+    store.flush()
+    store.close()
+    assert len(attempts) >= 2
+    assert not store._overlay
+    with open(os.path.join(tmp_path, "Anna", "retry.txt"), encoding="utf-8") as f:
+        assert f.read() == "hello"
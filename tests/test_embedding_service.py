@@ -0,0 +1,60 @@
+import asyncio
+import threading
+
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from embedding_service import BatchingEmbeddingService
+
+
+class GatedModel:
+    """Stub model whose first batch blocks until `release` is set."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.batches = []
+
+    def embed_documents(self, texts):
+        self.batches.append(list(texts))
+        self.started.set()
+        self.release.wait(timeout=5)
+        return [[float(len(t))] for t in texts]
+
+
+def test_cancelled_async_caller_does_not_kill_worker():
+    model = GatedModel()
+    service = BatchingEmbeddingService(model, window_ms=1)
+
+    async def scenario():
+        blocker = service.submit("blocker")  # keeps the worker busy
+        assert model.started.wait(timeout=1)
+        task = asyncio.ensure_future(service.aembed_query("cancel me"))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        model.release.set()
+        return blocker.result(timeout=1)
+
+    assert asyncio.run(scenario()) == [7.0]
+    assert service.submit("after").result(timeout=1) == [5.0]
+    assert service._worker.is_alive()
+    assert ["cancel me"] not in model.batches
+
+
+def test_model_error_is_delivered_and_worker_survives():
+    class FlakyModel:
+        calls = 0
+
+        def embed_documents(self, texts):
+            FlakyModel.calls += 1
+            if FlakyModel.calls == 1:
+                raise RuntimeError("boom")
+            return [[1.0] for _ in texts]
+
+    service = BatchingEmbeddingService(FlakyModel(), window_ms=1)
+    with pytest.raises(RuntimeError):
+        service.embed_query("first")
+    assert service.embed_query("second") == [1.0]
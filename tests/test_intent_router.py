@@ -0,0 +1,40 @@
+from intent_router import IntentRouter
+
+
+class StubEmbeddings:
+    """Everything looks alike, the way BGE scores most short texts 0.6+."""
+
+    def embed_documents(self, texts):
+        return [[1.0, 0.1] for _ in texts]
+
+    def embed_query(self, text):
+        return [1.0, 0.0]
+
+
+def test_rule_hit_for_unexposed_tool_falls_back_to_agent():
+    router = IntentRouter({"drafter_tool": "Draft emails and letters"}, embeddings=StubEmbeddings())
+    decision = router.route("What is the deductible for the CIBC plan?")
+    assert decision.tool is None
+    assert decision.scores["insurance_questions"] > 0
+
+
+def test_single_tool_is_never_routed_by_embedding():
+    router = IntentRouter({"drafter_tool": "Draft emails and letters"}, embeddings=StubEmbeddings())
+    assert router.route("hello there").tool is None
+    assert router.route("Draft an email to Bob").tool == "drafter_tool"
+
+
+def test_embedding_route_must_beat_null_description():
+    router = IntentRouter(
+        {"drafter_tool": "Draft emails", "lookup": "Look things up"}, embeddings=StubEmbeddings()
+    )
+    decision = router.route("hello there")
+    assert decision.tool is None
+    assert "<none>" in decision.scores
+
+
+def test_ambiguous_rules_keep_their_scores():
+    router = IntentRouter({"drafter_tool": "Draft", "insurance_questions": "Answer"})
+    decision = router.route("Draft an email about my claim coverage?")
+    assert decision.tool is None
+    assert decision.scores == {"drafter_tool": 1.0, "insurance_questions": 2.0}
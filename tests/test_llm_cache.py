@@ -0,0 +1,72 @@
+import threading
+import time
+
+from llm_cache import DiskStore, GenerationCache, MemoryStore, make_key
+
+
+def test_disk_store_ttl_is_not_reset_by_reads(tmp_path):
+    store = DiskStore(str(tmp_path), ttl=0.3)
+    store.set("k", "v")
+    deadline = time.time() + 0.6
+    while time.time() < deadline and store.get("k") is not None:
+        time.sleep(0.05)
+    assert store.get("k") is None
+
+
+def test_disk_store_evicts_least_recently_read(tmp_path):
+    store = DiskStore(str(tmp_path), max_entries=10)
+    for i in range(10):
+        store.set(f"k{i}", i)
+        time.sleep(0.01)
+    assert store.get("k0") == 0  # now the most recently used
+    store.set("k10", 10)
+    assert len(store) == 9
+    assert store.get("k0") == 0
+    assert store.get("k1") is None
+    assert store.get("k10") == 10
+
+
+def test_concurrent_misses_are_coalesced():
+    cache = GenerationCache(MemoryStore())
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(timeout=5)
+        return "answer"
+
+    key = make_key("llama3.2", ["hi"], params={"temperature": 0})
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute(key, compute)))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert results == ["answer"] * 8
+    assert len(calls) == 1
+    assert cache.stats["misses"] == 1
+    assert cache.stats["hits"] + cache.stats["coalesced"] == 7
+    assert cache.get_or_compute(key, compute) == "answer"
+    assert len(calls) == 1
+
+
+def test_leader_error_reaches_waiters_and_is_not_cached():
+    cache = GenerationCache(MemoryStore())
+
+    def boom():
+        raise RuntimeError("ollama down")
+
+    for _ in range(2):
+        try:
+            cache.get_or_compute("k", boom)
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("error was swallowed")
+    assert cache.store.get("k") is None
+    assert cache.stats["misses"] == 2
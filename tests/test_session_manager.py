@@ -0,0 +1,59 @@
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from session_manager import SessionManager
+
+
+def turn(n: int, size: int = 10):
+    return [HumanMessage(f"question {n} " + "x" * size), AIMessage(f"answer {n} " + "y" * size)]
+
+
+def test_duplicate_messages_are_skipped(tmp_path):
+    manager = SessionManager(str(tmp_path))
+    messages = turn(1)
+    manager.append("t", messages)
+    manager.append("t", messages + turn(2))
+    assert [m.content.split()[1] for m in manager.get("t")] == ["1", "1", "2", "2"]
+    assert manager.counters["duplicates_skipped"] == 2
+
+
+def test_trim_keeps_newest_and_never_starts_with_a_tool_result(tmp_path):
+    manager = SessionManager(str(tmp_path), max_messages=2)
+    manager.append("t", [
+        HumanMessage("save it"),
+        AIMessage("", tool_calls=[{"name": "save", "args": {}, "id": "call-1"}]),
+        ToolMessage("saved", tool_call_id="call-1"),
+        AIMessage("done"),
+    ])
+    history = manager.get("t")
+    # Trimming to 2 would start at the ToolMessage, which must not lead the history
+    assert [m.type for m in history] == ["ai"]
+    assert history[0].content == "done"
+
+
+def test_lru_sessions_are_evicted_and_rehydrated(tmp_path):
+    manager = SessionManager(str(tmp_path), max_total_bytes=2000)
+    for n in range(5):
+        manager.append(f"thread-{n}", turn(n, size=300))
+    metrics = manager.metrics()
+    assert metrics["evicted_sessions"] > 0
+    assert metrics["bytes_held"] <= 2000
+    assert "thread-0" not in manager._live
+
+    history = manager.get("thread-0")
+    assert [m.content.split()[1] for m in history] == ["0", "0"]
+    assert manager.counters["rehydrations"] == 1
+    assert "thread-0" in manager._live
+
+
+def test_drop_removes_live_and_spilled_state(tmp_path):
+    manager = SessionManager(str(tmp_path), max_total_bytes=1000)
+    manager.append("a", turn(1, size=400))
+    manager.append("b", turn(2, size=400))  # spills "a"
+    manager.drop("a")
+    manager.drop("b")
+    assert manager.get("a") == [] and manager.get("b") == []
+    assert manager.metrics()["bytes_held"] == 0